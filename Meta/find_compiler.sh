@@ -12,12 +12,14 @@ is_supported_compiler() {
     VERSION="$($COMPILER -dumpversion 2> /dev/null)" || return 1
     local MAJOR_VERSION=""
     MAJOR_VERSION="${VERSION%%.*}"
-    if $COMPILER --version 2>&1 | grep "Apple clang" >/dev/null; then
+    local VERSION_STRING=""
+    VERSION_STRING="$($COMPILER --version 2>&1)"
+    if [[ "$VERSION_STRING" == *"Apple clang"* ]]; then
         # Apple Clang version check
         BUILD_VERSION=$(echo | $COMPILER -dM -E - | grep __apple_build_version__ | cut -d ' ' -f3)
         # Xcode 14.3, based on upstream LLVM 15
         [ "$BUILD_VERSION" -ge 14030022 ] && return 0
-    elif $COMPILER --version 2>&1 | grep "clang" >/dev/null; then
+    elif [[ "$VERSION_STRING" == *"clang"* ]]; then
         # Clang version check
         [ "$MAJOR_VERSION" -ge 17 ] && return 0
     else
@@ -34,11 +36,10 @@ find_newest_compiler() {
         if ! command -v "$CANDIDATE" >/dev/null 2>&1; then
             continue
         fi
-        if ! $CANDIDATE -dumpversion >/dev/null 2>&1; then
+        local VERSION=""
+        if ! VERSION="$($CANDIDATE -dumpversion 2>/dev/null)"; then
             continue
         fi
-        local VERSION=""
-        VERSION="$($CANDIDATE -dumpversion)"
         local MAJOR_VERSION="${VERSION%%.*}"
         if [ "$MAJOR_VERSION" -gt "$BEST_VERSION" ]; then
             BEST_VERSION=$MAJOR_VERSION
@@ -52,7 +53,12 @@ pick_host_compiler() {
     CC=${CC:-"cc"}
     CXX=${CXX:-"c++"}
 
-    if is_supported_compiler "$CC" && is_supported_compiler "$CXX"; then
+    # Each check spawns several compiler driver processes, so probe CC and CXX concurrently
+    is_supported_compiler "$CC" &
+    local CC_PROBE_PID=$!
+    local CXX_SUPPORTED=false
+    is_supported_compiler "$CXX" && CXX_SUPPORTED=true
+    if wait "$CC_PROBE_PID" && $CXX_SUPPORTED; then
         return
     fi
 
@@ -67,7 +67,7 @@ CMAKE_ARGS=()
 CMD_ARGS=( "$@" )
 
 if [ "$(uname -s)" = Linux ] && [ "$(uname -m)" = "aarch64" ]; then
-    PKGCONFIG=$(which pkg-config)
+    PKGCONFIG=$(command -v pkg-config)
     GN=$(command -v gn || echo "")
     CMAKE_ARGS+=("-DPKG_CONFIG_EXECUTABLE=$PKGCONFIG")
     # https://github.com/LadybirdBrowser/ladybird/issues/261
@@ -76,15 +76,48 @@ if [ "$(uname -s)" = Linux ] && [ "$(uname -m)" = "aarch64" ]; then
             die "GN not found! Please build GN from source and put it in \$PATH"
         fi
     fi
-    cat <<- EOF > Meta/CMake/vcpkg/user-variables.cmake
-set(PKGCONFIG $PKGCONFIG)
-set(GN $GN)
-EOF
 
+    # Only rewrite the file if it changed, as it is included by our vcpkg triplets
+    USER_VARIABLES_FILE="$DIR/CMake/vcpkg/user-variables.cmake"
+    USER_VARIABLES="set(PKGCONFIG $PKGCONFIG)
+set(GN $GN)"
+    if [ ! -f "$USER_VARIABLES_FILE" ] || [ "$(< "$USER_VARIABLES_FILE")" != "$USER_VARIABLES" ]; then
+        echo "$USER_VARIABLES" > "$USER_VARIABLES_FILE"
+    fi
 fi
 
 get_top_dir() {
-    git rev-parse --show-toplevel
+    # This script lives in Meta/, so the source tree is the parent of $DIR
+    echo "${DIR%/*}"
+}
+
+# Reuse the compiler recorded in an already configured build directory instead of probing for one again
+load_cached_host_compiler() {
+    local CACHE_FILE="$BUILD_DIR/CMakeCache.txt"
+    [ -f "$CACHE_FILE" ] || return 1
+
+    local CACHED_CC=""
+    local CACHED_CXX=""
+    while IFS='=' read -r KEY VALUE; do
+        case "$KEY" in
+            CMAKE_C_COMPILER:*) CACHED_CC="$VALUE" ;;
+            CMAKE_CXX_COMPILER:*) CACHED_CXX="$VALUE" ;;
+        esac
+        [ -z "$CACHED_CC" ] || [ -z "$CACHED_CXX" ] || break
+    done < "$CACHE_FILE"
+
+    command -v "$CACHED_CC" >/dev/null 2>&1 || return 1
+    command -v "$CACHED_CXX" >/dev/null 2>&1 || return 1
+    export CC="$CACHED_CC"
+    export CXX="$CACHED_CXX"
+}
+
+ensure_host_compiler() {
+    if [ -n "$CC" ] || [ -n "$CXX" ] || ! load_cached_host_compiler; then
+        pick_host_compiler
+    fi
+    CMAKE_ARGS+=("-DCMAKE_C_COMPILER=${CC}")
+    CMAKE_ARGS+=("-DCMAKE_CXX_COMPILER=${CXX}")
 }
 
 create_build_dir() {
@@ -93,10 +126,6 @@ create_build_dir() {
 }
 
 cmd_with_target() {
-    pick_host_compiler
-    CMAKE_ARGS+=("-DCMAKE_C_COMPILER=${CC}")
-    CMAKE_ARGS+=("-DCMAKE_CXX_COMPILER=${CXX}")
-
     if [ ! -d "$LADYBIRD_SOURCE_DIR" ]; then
         LADYBIRD_SOURCE_DIR="$(get_top_dir)"
         export LADYBIRD_SOURCE_DIR
@@ -117,7 +146,17 @@ cmd_with_target() {
 
     CMAKE_ARGS+=("-DCMAKE_INSTALL_PREFIX=$LADYBIRD_SOURCE_DIR/Build/ladybird-install-${BUILD_PRESET}")
 
-    export PATH="$LADYBIRD_SOURCE_DIR/Toolchain/Local/cmake/bin:$LADYBIRD_SOURCE_DIR/Toolchain/Local/vcpkg/bin:$PATH"
+    # Move the toolchain directories to the front of PATH, without adding duplicate entries (e.g. when invoked recursively)
+    local TOOLCHAIN_BIN_DIR=""
+    for TOOLCHAIN_BIN_DIR in "$LADYBIRD_SOURCE_DIR/Toolchain/Local/vcpkg/bin" "$LADYBIRD_SOURCE_DIR/Toolchain/Local/cmake/bin"; do
+        PATH=":$PATH:"
+        while [[ "$PATH" == *":$TOOLCHAIN_BIN_DIR:"* ]]; do
+            PATH="${PATH/":$TOOLCHAIN_BIN_DIR:"/:}"
+        done
+        PATH="${PATH#:}"
+        PATH="$TOOLCHAIN_BIN_DIR:${PATH%:}"
+    done
+    export PATH
     export VCPKG_ROOT="$LADYBIRD_SOURCE_DIR/Toolchain/Tarballs/vcpkg"
 }
 
@@ -134,20 +173,20 @@ run_tests() {
         fi
         CTEST_ARGS+=("-R" "$TEST_NAME")
     fi
-    ctest "${CTEST_ARGS[@]}"
+    exec ctest "${CTEST_ARGS[@]}"
 }
 
 build_target() {
-    # Get either the environment MAKEJOBS or all processors via CMake
-    [ -z "$MAKEJOBS" ] && MAKEJOBS=$(cmake -P "$LADYBIRD_SOURCE_DIR/Meta/CMake/processor-count.cmake")
+    local BUILD_ARGS=()
+
+    # Use the environment MAKEJOBS if set, otherwise let ninja use all processors
+    [ -z "$MAKEJOBS" ] || BUILD_ARGS+=("--parallel" "$MAKEJOBS")
 
     # With zero args, we are doing a standard "build"
     # With multiple args, we are doing an install/run
-    if [ $# -eq 0 ]; then
-        CMAKE_BUILD_PARALLEL_LEVEL="$MAKEJOBS" cmake --build "$BUILD_DIR"
-    else
-        ninja -j "$MAKEJOBS" -C "$BUILD_DIR" -- "$@"
-    fi
+    [ $# -eq 0 ] || BUILD_ARGS+=("--" "$@")
+
+    cmake --build "$BUILD_DIR" "${BUILD_ARGS[@]}"
 }
 
 delete_target() {
@@ -159,6 +198,27 @@ build_vcpkg() {
 }
 
 ensure_toolchain() {
+    local VCPKG_PREFIX_DIR="$LADYBIRD_SOURCE_DIR/Toolchain/Local/vcpkg"
+
+    # Avoid running BuildVcpkg.sh (and its git commands) if the pinned revision was already built
+    local EXPECTED_REV=""
+    local LINE=""
+    while IFS= read -r LINE; do
+        if [[ "$LINE" =~ ^GIT_REV=\"([0-9a-f]+)\" ]]; then
+            EXPECTED_REV="${BASH_REMATCH[1]}"
+            break
+        fi
+    done < "$LADYBIRD_SOURCE_DIR/Toolchain/BuildVcpkg.sh"
+
+    local BUILT_REV=""
+    [ ! -f "$VCPKG_PREFIX_DIR/.built_rev" ] || read -r BUILT_REV < "$VCPKG_PREFIX_DIR/.built_rev"
+
+    # The checkout in Toolchain/Tarballs is needed as well, since it provides VCPKG_ROOT and the CMake toolchain file
+    if [ -n "$EXPECTED_REV" ] && [ "$BUILT_REV" = "$EXPECTED_REV" ] && [ -x "$VCPKG_PREFIX_DIR/bin/vcpkg" ] \
+        && [ -f "$LADYBIRD_SOURCE_DIR/Toolchain/Tarballs/vcpkg/scripts/buildsystems/vcpkg.cmake" ]; then
+        return
+    fi
+
     build_vcpkg
 }
 
@@ -200,7 +260,7 @@ run_gdb() {
             LAGOM_EXECUTABLE="Ladybird"
         fi
     fi
-    "$GDB" "$BUILD_DIR/bin/$LAGOM_EXECUTABLE" "${GDB_ARGS[@]}"
+    exec "$GDB" "$BUILD_DIR/bin/$LAGOM_EXECUTABLE" "${GDB_ARGS[@]}"
 }
 
 build_and_run_lagom_target() {
@@ -224,66 +284,96 @@ build_and_run_lagom_target() {
     build_target "${lagom_target}"
 
     if [[ "$lagom_target" =~ ^(headless-browser|ImageDecoder|Ladybird|RequestServer|WebContent|WebDriver|WebWorker)$ ]] && [ "$(uname -s)" = "Darwin" ]; then
-        "$BUILD_DIR/bin/Ladybird.app/Contents/MacOS/$lagom_target" "${lagom_args[@]}"
+        exec "$BUILD_DIR/bin/Ladybird.app/Contents/MacOS/$lagom_target" "${lagom_args[@]}"
     else
-        "$BUILD_DIR/bin/$lagom_target" "${lagom_args[@]}"
+        exec "$BUILD_DIR/bin/$lagom_target" "${lagom_args[@]}"
     fi
 }
 
-if [[ "$CMD" =~ ^(build|install|run|gdb|test|rebuild|recreate|addr2line)$ ]]; then
+prepare_target() {
     cmd_with_target
     [[ "$CMD" != "recreate" && "$CMD" != "rebuild" ]] || delete_target
+    # Note: This must come after delete_target, so that rebuild and recreate detect the compiler anew
+    ensure_host_compiler
     ensure_toolchain
     ensure_target
-    case "$CMD" in
-        build)
-            build_target "${CMD_ARGS[@]}"
-            ;;
-        install)
-            build_target
-            build_target install
-            ;;
-        run)
-            build_and_run_lagom_target
-            ;;
-        gdb)
-          [ $# -ge 1 ] || usage
-          build_target "${CMD_ARGS[@]}"
-          run_gdb "${CMD_ARGS[@]}"
-          ;;
-        test)
-            build_target
-            run_tests "${CMD_ARGS[0]}"
-            ;;
-        rebuild)
-            build_target "${CMD_ARGS[@]}"
-            ;;
-        recreate)
-            ;;
-        addr2line)
-            build_target
-            [ $# -ge 2 ] || usage
-            BINARY_FILE="$1"; shift
-            BINARY_FILE_PATH="$BUILD_DIR/$BINARY_FILE"
-            command -v addr2line >/dev/null 2>&1 || die "Please install addr2line!"
+}
+
+case "$CMD" in
+    build)
+        prepare_target
+        build_target "${CMD_ARGS[@]}"
+        ;;
+    install)
+        prepare_target
+        build_target
+        build_target install
+        ;;
+    run)
+        prepare_target
+        build_and_run_lagom_target
+        ;;
+    gdb)
+        prepare_target
+        [ $# -ge 1 ] || usage
+        build_target "${CMD_ARGS[@]}"
+        run_gdb "${CMD_ARGS[@]}"
+        ;;
+    test)
+        prepare_target
+        build_target
+        run_tests "${CMD_ARGS[0]}"
+        ;;
+    rebuild)
+        prepare_target
+        build_target "${CMD_ARGS[@]}"
+        ;;
+    recreate)
+        prepare_target
+        ;;
+    addr2line)
+        prepare_target
+        build_target
+        [ $# -ge 2 ] || usage
+        BINARY_FILE="$1"; shift
+        BINARY_FILE_PATH="$BUILD_DIR/$BINARY_FILE"
+        # llvm-addr2line parses the debug info once for all addresses, and is otherwise compatible with addr2line
+        if command -v llvm-addr2line >/dev/null 2>&1; then
+            ADDR2LINE=llvm-addr2line
+        elif command -v addr2line >/dev/null 2>&1; then
             ADDR2LINE=addr2line
-            if [ -x "$BINARY_FILE_PATH" ]; then
+        else
+            die "Please install llvm-addr2line or addr2line!"
+        fi
+        if [ -x "$BINARY_FILE_PATH" ]; then
+            "$ADDR2LINE" -e "$BINARY_FILE_PATH" "$@"
+        else
+            # All of our executables and libraries end up in these directories, so don't walk the whole build tree
+            SEARCH_DIRS=()
+            # Note: CMAKE_INSTALL_LIBDIR is lib64 on some 64-bit distributions
+            for SEARCH_DIR in bin lib lib64 libexec; do
+                [ ! -d "$BUILD_DIR/$SEARCH_DIR" ] || SEARCH_DIRS+=("$BUILD_DIR/$SEARCH_DIR")
+            done
+            [ ${#SEARCH_DIRS[@]} -gt 0 ] || die "Could not find any build output in $BUILD_DIR"
+            FOUND_BINARY_FILE=0
+            while IFS= read -r -d '' BINARY_FILE_PATH; do
+                FOUND_BINARY_FILE=1
                 "$ADDR2LINE" -e "$BINARY_FILE_PATH" "$@"
-            else
-                find "$BUILD_DIR" -name "$BINARY_FILE" -executable -type f -exec "$ADDR2LINE" -e {} "$@" \;
-            fi
-            ;;
-        *)
-            build_target "$CMD" "${CMD_ARGS[@]}"
-            ;;
-    esac
-elif [ "$CMD" = "delete" ]; then
-    cmd_with_target
-    delete_target
-elif [ "$CMD" = "vcpkg" ]; then
-    cmd_with_target
-    ensure_toolchain
-else
-    >&2 echo "Unknown command: $CMD"
-    usage
-fi
+            done < <(find "${SEARCH_DIRS[@]}" -name "$BINARY_FILE" -executable -type f -print0)
+            [ "$FOUND_BINARY_FILE" -eq 1 ] || die "Could not find $BINARY_FILE in $BUILD_DIR"
+        fi
+        ;;
+    delete)
+        cmd_with_target
+        delete_target
+        ;;
+    vcpkg)
+        cmd_with_target
+        ensure_host_compiler
+        ensure_toolchain
+        ;;
+    *)
+        >&2 echo "Unknown command: $CMD"
+        usage
+        ;;
+esac
@@ -49,3 +49,14 @@ get_number_of_processing_units() {
 
   ($number_of_processing_units)
 }
+
+# Usage: link_or_copy_file <Source File> <Destination Directory>
+# Hard links the file into the destination directory if possible, and copies it otherwise (e.g. across file systems).
+link_or_copy_file()
+{
+    local destination="$2/${1##*/}"
+    if [ "$1" -ef "$destination" ]; then
+        return 0
+    fi
+    ln -f "$1" "$destination" 2>/dev/null || cp "$1" "$destination"
+}
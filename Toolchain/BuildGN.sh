@@ -21,16 +21,21 @@ PREFIX_DIR="$DIR/Local/gn"
 mkdir -p "$DIR"/Tarballs
 pushd "$DIR"/Tarballs
 
-[ ! -d gn ] && git clone $GIT_REPO
+[ ! -d gn ] && git clone --filter=blob:none --no-checkout $GIT_REPO
 
 cd gn
-git fetch origin
+CURRENT_REV=$(git rev-parse HEAD)
+if [ "$CURRENT_REV" = "$GIT_REV" ] && [ -x "$PREFIX_DIR/bin/gn" ]; then
+    exit 0
+fi
+
+[ "$CURRENT_REV" = "$GIT_REV" ] || git fetch origin
 git checkout $GIT_REV
 
 ./build/gen.py --out-path="$BUILD_DIR" --allow-warnings
-ninja -C "$BUILD_DIR"
+ninja -j "$MAKEJOBS" -C "$BUILD_DIR"
 
 mkdir -p "$PREFIX_DIR/bin"
-cp "$BUILD_DIR/gn" "$PREFIX_DIR/bin"
+link_or_copy_file "$BUILD_DIR/gn" "$PREFIX_DIR/bin"
 
 popd
@@ -24,14 +24,21 @@ GIT_REPO="https://github.com/microsoft/vcpkg.git"
 GIT_REV="a39a74405f277773aba08018bb797cb4a6614d0c" # 2024.09.19
 PREFIX_DIR="$DIR/Local/vcpkg"
 
+# Records the revision that was last built, so ladybird.sh can skip running this script entirely
+write_built_rev() {
+    mkdir -p "$PREFIX_DIR"
+    echo "$GIT_REV" > "$PREFIX_DIR/.built_rev"
+}
+
 mkdir -p "$DIR/Tarballs"
 pushd "$DIR/Tarballs"
     if [[ ! -d vcpkg ]]; then
-        git clone "${GIT_REPO}"
+        git clone --filter=blob:none --no-checkout "${GIT_REPO}"
     else
         bootstrapped_vcpkg_version=$(git -C vcpkg rev-parse HEAD)
 
-        if [[ "${bootstrapped_vcpkg_version}" == "${GIT_REV}" ]]; then
+        if [[ "${bootstrapped_vcpkg_version}" == "${GIT_REV}" ]] && [[ -x "$PREFIX_DIR/bin/vcpkg" ]]; then
+            write_built_rev
             exit 0
         fi
     fi
@@ -39,11 +46,14 @@ pushd "$DIR/Tarballs"
     echo "Building vcpkg"
 
     cd vcpkg
-    git fetch origin
-    git checkout $GIT_REV
+    if [[ "${bootstrapped_vcpkg_version}" != "${GIT_REV}" ]]; then
+        git fetch origin
+        git checkout $GIT_REV
+    fi
 
     ./bootstrap-vcpkg.sh -disableMetrics
 
     mkdir -p "$PREFIX_DIR/bin"
-    cp vcpkg "$PREFIX_DIR/bin"
+    link_or_copy_file vcpkg "$PREFIX_DIR/bin"
+    write_built_rev
 popd